@@ -12,7 +12,17 @@ Prime positions (1-indexed): (1,2), (1,4), (2,1), (2,3), (3,2), (3,4), (4,1), (4
 """
 
 import sys
-from typing import List, Set, Tuple, Optional
+from multiprocessing import Pool
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+try:
+    import three_solve_bitset  # Cython build, see setup.py
+
+    HAVE_CYTHON = True
+except ImportError:  # Not compiled; the pure-Python (or, with --jit, Numba) solver is used.
+    HAVE_CYTHON = False
 
 # Grid dimensions
 SIZE = 5
@@ -27,10 +37,35 @@ PRIME_POSITIONS = [
     (4, 1), (4, 3),  # Row 5: Col 2, 4
 ]
 
+# The grid is a flat np.int8 array of TOTAL_CELLS values: (row, col) is grid[row * SIZE + col].
+# Tables read by the search functions are tuples or arrays so Numba can type
+# them when --jit compiles those functions.
+PRIME_IDX = np.array([row * SIZE + col for row, col in PRIME_POSITIONS], dtype=np.int64)
+PRIME_COUNT = len(PRIME_POSITIONS)
+IS_PRIME = tuple(bool(idx in PRIME_IDX) for idx in range(TOTAL_CELLS))
+
 # Fixed center cell
 CENTER_ROW, CENTER_COL = 2, 2  # 0-indexed (Row 3, Col 3)
+CENTER_IDX = CENTER_ROW * SIZE + CENTER_COL
 CENTER_VALUE = 13
 
+# Fill order: the prime positions first, so C3's parity is settled ten cells
+# in rather than near the end, then the rest row by row. The fixed center is
+# not searched.
+ORDER = tuple(PRIME_IDX.tolist()) + tuple(
+    idx for idx in range(TOTAL_CELLS) if not IS_PRIME[idx] and idx != CENTER_IDX
+)
+
+# Symmetry breaking. Of the rotations and reflections of the square, only the
+# mirror that swaps the top and bottom rows keeps the prime positions (the
+# others move a prime position onto (1,4) or (3,4), 0-indexed, which are not
+# prime); it also keeps C1, C2 and the center. Every solution or its mirror
+# image has a top-left corner below its bottom-left corner, so only those
+# grids are searched. A cell must exceed the value at CORNER_ABOVE[pos]
+# (-1: no bound), which ORDER fills first.
+CORNER_ABOVE = np.full(TOTAL_CELLS, -1, dtype=np.int64)
+CORNER_ABOVE[TOTAL_CELLS - SIZE] = 0
+
 
 def is_prime_position(row: int, col: int) -> bool:
     """Check if a position (0-indexed) is a prime-numbered position."""
@@ -57,175 +92,320 @@ def get_diagonal_neighbors(row: int, col: int) -> List[Tuple[int, int]]:
     return neighbors
 
 
-def violates_c1(grid: List[List[int]], row: int, col: int, value: int) -> bool:
-    """Check if placing value at (row, col) violates C1 (orthogonal consecutive constraint)."""
-    for nr, nc in get_orthogonal_neighbors(row, col):
-        neighbor_value = grid[nr][nc]
-        if neighbor_value != 0:  # If neighbor is filled
-            if abs(neighbor_value - value) == 1:
-                return True
-    return False
+def _build_neighbor_table(get_neighbors) -> Tuple[Tuple[int, ...], ...]:
+    """Flat indices of the neighbours of every flat cell index."""
+    return tuple(
+        tuple(nr * SIZE + nc for nr, nc in get_neighbors(pos // SIZE, pos % SIZE))
+        for pos in range(TOTAL_CELLS)
+    )
 
 
-def violates_c2(grid: List[List[int]], row: int, col: int, value: int) -> bool:
-    """Check if placing value at (row, col) violates C2 (diagonal difference of 2 constraint)."""
-    for nr, nc in get_diagonal_neighbors(row, col):
-        neighbor_value = grid[nr][nc]
-        if neighbor_value != 0:  # If neighbor is filled
-            if abs(neighbor_value - value) == 2:
-                return True
-    return False
+NEIGH_ORTHO = _build_neighbor_table(get_orthogonal_neighbors)
+NEIGH_DIAG = _build_neighbor_table(get_diagonal_neighbors)
 
+# The same tables as (TOTAL_CELLS, 4) arrays padded with -1, which Numba can type
+NEIGH_ORTHO_ARR = np.array([n + (-1,) * (4 - len(n)) for n in NEIGH_ORTHO], dtype=np.int64)
+NEIGH_DIAG_ARR = np.array([n + (-1,) * (4 - len(n)) for n in NEIGH_DIAG], dtype=np.int64)
 
-def check_c3(grid: List[List[int]]) -> bool:
-    """Check if C3 constraint is satisfied (sum of prime positions is even)."""
-    prime_sum = 0
-    for row, col in PRIME_POSITIONS:
-        value = grid[row][col]
-        if value == 0:  # If any prime position is not filled, constraint not yet determined
-            return True  # Don't fail yet, wait until all are filled
-        prime_sum += value
-    return prime_sum % 2 == 0
+# Bit v of a value mask stands for value v (bit 0 is unused)
+ALL_VALUES_MASK = ((1 << (TOTAL_CELLS + 1)) - 1) & ~1
+ODD_VALUES_MASK = sum(1 << value for value in range(1, TOTAL_CELLS + 1, 2))
+EVEN_VALUES_MASK = ALL_VALUES_MASK & ~ODD_VALUES_MASK
+# C3: the last prime position must take a value of the same parity as the
+# prime positions filled before it, so index by that parity.
+PARITY_VALUES = (EVEN_VALUES_MASK, ODD_VALUES_MASK)
 
 
-def is_valid_placement(grid: List[List[int]], row: int, col: int, value: int) -> bool:
-    """Check if placing value at (row, col) is valid according to all constraints."""
-    # Check C1: Orthogonal consecutive constraint
-    if violates_c1(grid, row, col, value):
-        return False
+def _build_value_forbid(delta: int) -> np.ndarray:
+    """
+    For every grid value v, the mask of values v - delta and v + delta (those
+    in 1..TOTAL_CELLS). Entry 0, an empty cell, forbids nothing.
+    """
+    forbid = np.zeros(TOTAL_CELLS + 1, dtype=np.int64)
+    for value in range(1, TOTAL_CELLS + 1):
+        for other in (value - delta, value + delta):
+            if 1 <= other <= TOTAL_CELLS:
+                forbid[value] |= 1 << other
+    return forbid
+
+
+ORTHO_FORBID = _build_value_forbid(1)  # C1
+DIAG_FORBID = _build_value_forbid(2)  # C2
+
+# De Bruijn table mapping (lowest set bit * 0x077CB531) >> 27 to its index.
+_DEBRUIJN_CTZ = (
+    0, 1, 28, 2, 29, 14, 24, 3, 30, 22, 20, 15, 25, 17, 4, 8,
+    31, 27, 13, 23, 21, 19, 16, 7, 26, 12, 18, 6, 11, 5, 10, 9,
+)
+
+
+def _ctz(bit: int) -> int:
+    """Index of a single set bit (bit must be a power of two below 2**32)."""
+    return _DEBRUIJN_CTZ[((bit * 0x077CB531) & 0xFFFFFFFF) >> 27]
+
+
+def _forbidden_values(grid: np.ndarray, pos: int) -> int:
+    """Mask of the values C1 and C2 rule out at flat index pos given its filled neighbours."""
+    forbidden = 0
+    for k in range(4):
+        n = NEIGH_ORTHO_ARR[pos, k]
+        if n < 0:
+            break
+        forbidden |= ORTHO_FORBID[grid[n]]
+    for k in range(4):
+        n = NEIGH_DIAG_ARR[pos, k]
+        if n < 0:
+            break
+        forbidden |= DIAG_FORBID[grid[n]]
+    return forbidden
+
+
+def _prime_state(grid: np.ndarray) -> Tuple[int, int]:
+    """Number of filled prime positions and the parity of their sum."""
+    prime_filled = 0
+    prime_parity = 0
+    for idx in PRIME_IDX:
+        if grid[idx]:
+            prime_filled += 1
+            prime_parity ^= grid[idx] & 1
+    return prime_filled, prime_parity
+
+
+def solve_from(grid: np.ndarray, used_mask: int, start_depth: int) -> bool:
+    """
+    Backtracking solver for the grid assignment problem, with the cells
+    ORDER[:start_depth] already filled and kept fixed.
+
+    Cells are filled in ORDER by an explicit loop instead of recursion:
+    last[depth] is the value currently tried at ORDER[depth] (0 if none), so
+    moving back to a cell resumes from the next larger value. Only values
+    that are unused and not ruled out by C1/C2 against the filled neighbours
+    (_forbidden_values) are ever tried. C3 is kept as a running parity of the
+    filled prime positions: the last one only gets values that make the sum
+    even. The bottom-left corner only gets values above the top-left one
+    (CORNER_ABOVE), which breaks the top-bottom mirror symmetry.
+
+    There is no table of unsolvable (depth, used_mask, frontier values)
+    states: from the empty grid this loop places 24 values for the 24 cells
+    without a single backtrack, so such a table would never be consulted.
     
-    # Check C2: Diagonal difference of 2 constraint
-    if violates_c2(grid, row, col, value):
-        return False
+    Args:
+        grid: Current flat grid state (0 means unassigned)
+        used_mask: Bit value set for every value already placed
+        start_depth: Number of leading ORDER cells that are already filled
     
+    Returns:
+        True if solution found (left in grid), False otherwise
+    """
+    last = np.zeros(len(ORDER), dtype=np.int64)
+    # Number of prime positions filled so far and the parity of their sum
+    prime_filled, prime_parity = _prime_state(grid)
+    depth = start_depth
+
+    while depth < len(ORDER):
+        pos = ORDER[depth]
+
+        # Coming back to pos: take its current value off before trying the next
+        value = last[depth]
+        if value:
+            grid[pos] = 0
+            used_mask ^= 1 << value
+            if IS_PRIME[pos]:
+                prime_filled -= 1
+                prime_parity ^= value & 1
+
+        # Try each unused value above the last one tried here, lowest first
+        candidates = ALL_VALUES_MASK & ~used_mask & ~_forbidden_values(grid, pos) & ~((2 << value) - 1)
+        if IS_PRIME[pos] and prime_filled == PRIME_COUNT - 1:
+            candidates &= PARITY_VALUES[prime_parity]
+        if CORNER_ABOVE[pos] >= 0:
+            candidates &= ~((2 << int(grid[CORNER_ABOVE[pos]])) - 1)
+
+        if not candidates:
+            # Backtrack to the previous cell in ORDER
+            last[depth] = 0
+            depth -= 1
+            if depth < start_depth:
+                return False
+            continue
+
+        # Place the lowest candidate and advance
+        bit = candidates & -candidates
+        value = _ctz(bit)
+        grid[pos] = value
+        used_mask |= bit
+        last[depth] = value
+        if IS_PRIME[pos]:
+            prime_filled += 1
+            prime_parity ^= value & 1
+        depth += 1
+
+    # All cells filled; the parity rule on the last prime position enforced C3
     return True
 
 
-def get_next_position(row: int, col: int) -> Tuple[int, int]:
-    """Get next position in row-major order."""
-    if col < SIZE - 1:
-        return row, col + 1
-    else:
-        return row + 1, 0
+# ORDER, IS_PRIME and PARITY_VALUES as int64 arrays for the Cython kernel,
+# built once rather than on every solve_from_aot() call.
+_ORDER_ARR = np.array(ORDER, dtype=np.int64)
+_IS_PRIME_ARR = np.array(IS_PRIME, dtype=np.int64)
+_PARITY_VALUES_ARR = np.array(PARITY_VALUES, dtype=np.int64)
+
+
+def _kernel_tables() -> Tuple[np.ndarray, ...]:
+    """The tables three_solve_bitset.solve_from() takes after start_depth, as arrays."""
+    return (
+        _ORDER_ARR,
+        _IS_PRIME_ARR,
+        NEIGH_ORTHO_ARR,
+        NEIGH_DIAG_ARR,
+        ORTHO_FORBID,
+        DIAG_FORBID,
+        _PARITY_VALUES_ARR,
+        CORNER_ABOVE,
+        PRIME_COUNT,
+        ALL_VALUES_MASK,
+    )
+
 
+def solve_from_aot(grid: np.ndarray, used_mask: int, start_depth: int) -> bool:
+    """solve_from() on the Cython-compiled three_solve_bitset kernel."""
+    return three_solve_bitset.solve_from(grid, used_mask, start_depth, *_kernel_tables())
 
-def solve_grid(grid: List[List[int]], used: Set[int], row: int, col: int) -> bool:
+
+# Prefer the AOT build (no compile step at startup), then plain Python.
+_solve_from = solve_from_aot if HAVE_CYTHON else solve_from
+
+
+def _use_numba() -> bool:
     """
-    Backtracking solver for the grid assignment problem.
-    
-    Args:
-        grid: Current grid state (0 means unassigned)
-        used: Set of values already used
-        row, col: Current position to fill (0-indexed)
-    
-    Returns:
-        True if solution found, False otherwise
+    Rebind the search functions to Numba-compiled versions (--jit without the
+    Cython build); False if Numba is not installed. Off by default: the search
+    places only 24 values, so compiling or even loading the cache costs far
+    more than it saves.
     """
-    # Base case: all cells filled
-    if row >= SIZE:
-        # Final check: C3 constraint (sum of prime positions must be even)
-        if check_c3(grid):
-            return True
+    try:
+        from numba import njit
+    except ImportError:
         return False
-    
-    # Skip center cell (already fixed)
-    if row == CENTER_ROW and col == CENTER_COL:
-        next_row, next_col = get_next_position(row, col)
-        return solve_grid(grid, used, next_row, next_col)
-    
-    # Try each unused value
-    for value in range(1, TOTAL_CELLS + 1):
-        if value in used:
-            continue
-        
-        # Check if placement is valid
-        if not is_valid_placement(grid, row, col, value):
-            continue
-        
-        # Place value
-        grid[row][col] = value
-        used.add(value)
-        
-        # Early C3 check: if all prime positions are filled, verify constraint
-        # This helps prune invalid branches early
-        if all(grid[r][c] != 0 for r, c in PRIME_POSITIONS):
-            if not check_c3(grid):
-                # Constraint violated, backtrack
-                grid[row][col] = 0
-                used.remove(value)
-                continue
-        
-        # Recursively solve next position
-        next_row, next_col = get_next_position(row, col)
-        if solve_grid(grid, used, next_row, next_col):
-            return True
-        
-        # Backtrack
-        grid[row][col] = 0
-        used.remove(value)
-    
-    return False
+
+    global _ctz, _forbidden_values, _prime_state, solve_from, _solve_from
+    _ctz = njit(cache=True)(_ctz)
+    _forbidden_values = njit(cache=True)(_forbidden_values)
+    _prime_state = njit(cache=True)(_prime_state)
+    solve_from = njit(cache=True)(solve_from)
+    _solve_from = solve_from
+    return True
+
+
+def solve_grid(grid: np.ndarray, used_mask: int) -> bool:
+    """Search from the empty grid (center aside); the solution is left in grid."""
+    return _solve_from(grid, used_mask, 0)
+
+
+# Depth of the root split for solve_parallel: one task per consistent
+# assignment of the first SPLIT_DEPTH cells of ORDER.
+SPLIT_DEPTH = 2
+
+
+def _seed_states(grid: np.ndarray, used_mask: int, split_depth: int) -> List[Tuple[np.ndarray, int]]:
+    """
+    Every consistent assignment of ORDER[:split_depth] as a (grid, used_mask)
+    pair, in the order the sequential search would reach them.
+    """
+    states = [(grid, used_mask)]
+    for depth in range(split_depth):
+        pos = ORDER[depth]
+        next_states = []
+        for state_grid, state_used in states:
+            candidates = ALL_VALUES_MASK & ~state_used & ~_forbidden_values(state_grid, pos)
+            prime_filled, prime_parity = _prime_state(state_grid)
+            if IS_PRIME[pos] and prime_filled == PRIME_COUNT - 1:
+                candidates &= PARITY_VALUES[prime_parity]
+            if CORNER_ABOVE[pos] >= 0:
+                candidates &= ~((2 << int(state_grid[CORNER_ABOVE[pos]])) - 1)
+            while candidates:
+                bit = candidates & -candidates
+                candidates ^= bit
+                child = state_grid.copy()
+                child[pos] = _ctz(bit)
+                next_states.append((child, state_used | bit))
+        states = next_states
+    return states
+
+
+def _solve_seed(state: Tuple[np.ndarray, int]) -> Optional[np.ndarray]:
+    """Pool task: finish one seed grid from SPLIT_DEPTH, or None if it has no solution."""
+    grid, used_mask = state
+    return grid if _solve_from(grid, used_mask, SPLIT_DEPTH) else None
+
+
+def solve_parallel(grid: np.ndarray, used_mask: int, processes: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    Split the search at SPLIT_DEPTH and finish the seeds on a process pool.
+    Results are consumed in seed order, so the solution is the one the
+    sequential search finds; the pool is terminated as soon as it is known.
+    """
+    with Pool(processes) as pool:
+        for solution in pool.imap(_solve_seed, _seed_states(grid, used_mask, SPLIT_DEPTH)):
+            if solution is not None:
+                return solution
+    return None
 
 
-def print_grid(grid: List[List[int]]):
+def print_grid(grid: np.ndarray):
     """Print grid in a readable format."""
     print("\nGrid:")
-    for row in grid:
+    for row in grid.reshape(SIZE, SIZE):
         print(" ".join(f"{val:3d}" for val in row))
     print()
 
 
-def format_solution(grid: List[List[int]]) -> str:
+def format_solution(grid: np.ndarray) -> str:
     """Format solution as comma-separated string (row by row, left to right)."""
-    result = []
-    for row in grid:
-        result.extend(str(val) for val in row)
-    return ",".join(result)
+    return ",".join(map(str, grid.tolist()))
 
 
-def verify_solution(grid: List[List[int]]) -> bool:
+def verify_solution(grid: np.ndarray) -> bool:
     """Verify that the solution satisfies all constraints."""
     print("Verifying solution...")
     
     # Check all values 1-25 are used exactly once
-    all_values = set()
-    for row in grid:
-        all_values.update(row)
+    all_values = set(grid.tolist())
     if all_values != set(range(1, 26)):
         print("ERROR: Not all values 1-25 are used!")
         return False
     print("✓ All values 1-25 used exactly once")
     
     # Check center cell
-    if grid[CENTER_ROW][CENTER_COL] != CENTER_VALUE:
-        print(f"ERROR: Center cell should be {CENTER_VALUE}, got {grid[CENTER_ROW][CENTER_COL]}")
+    if grid[CENTER_IDX] != CENTER_VALUE:
+        print(f"ERROR: Center cell should be {CENTER_VALUE}, got {grid[CENTER_IDX]}")
         return False
     print(f"✓ Center cell is {CENTER_VALUE}")
     
     # Check C1: Orthogonal consecutive constraint
-    for row in range(SIZE):
-        for col in range(SIZE):
-            value = grid[row][col]
-            for nr, nc in get_orthogonal_neighbors(row, col):
-                neighbor_value = grid[nr][nc]
-                if abs(neighbor_value - value) == 1:
-                    print(f"ERROR: C1 violation at ({row+1},{col+1})={value} and ({nr+1},{nc+1})={neighbor_value}")
-                    return False
+    for idx in range(TOTAL_CELLS):
+        value = int(grid[idx])
+        for n in NEIGH_ORTHO[idx]:
+            neighbor_value = int(grid[n])
+            if abs(neighbor_value - value) == 1:
+                (row, col), (nr, nc) = divmod(idx, SIZE), divmod(n, SIZE)
+                print(f"ERROR: C1 violation at ({row+1},{col+1})={value} and ({nr+1},{nc+1})={neighbor_value}")
+                return False
     print("✓ C1 (Orthogonal consecutive) constraint satisfied")
     
     # Check C2: Diagonal difference of 2 constraint
-    for row in range(SIZE):
-        for col in range(SIZE):
-            value = grid[row][col]
-            for nr, nc in get_diagonal_neighbors(row, col):
-                neighbor_value = grid[nr][nc]
-                if abs(neighbor_value - value) == 2:
-                    print(f"ERROR: C2 violation at ({row+1},{col+1})={value} and ({nr+1},{nc+1})={neighbor_value}")
-                    return False
+    for idx in range(TOTAL_CELLS):
+        value = int(grid[idx])
+        for n in NEIGH_DIAG[idx]:
+            neighbor_value = int(grid[n])
+            if abs(neighbor_value - value) == 2:
+                (row, col), (nr, nc) = divmod(idx, SIZE), divmod(n, SIZE)
+                print(f"ERROR: C2 violation at ({row+1},{col+1})={value} and ({nr+1},{nc+1})={neighbor_value}")
+                return False
     print("✓ C2 (Diagonal difference of 2) constraint satisfied")
     
     # Check C3: Prime positions sum is even
-    prime_sum = sum(grid[r][c] for r, c in PRIME_POSITIONS)
+    prime_sum = int(grid[PRIME_IDX].sum())
     if prime_sum % 2 != 0:
         print(f"ERROR: C3 violation - sum of prime positions is {prime_sum} (odd)")
         return False
@@ -234,17 +414,62 @@ def verify_solution(grid: List[List[int]]) -> bool:
     return True
 
 
+def verify_grid(grid: np.ndarray) -> bool:
+    """Cross-check the finished grid against every constraint with verify.py."""
+    from verify import verify_c1, verify_c2, verify_c3, verify_permutation
+
+    return (grid[CENTER_IDX] == CENTER_VALUE and verify_permutation(grid) and verify_c1(grid)
+            and verify_c2(grid) and verify_c3(grid, PRIME_IDX))
+
+
+USAGE = "usage: 3_solve_grid.py [--verify] [--jit] [--jobs N]"
+
+
+def _jobs_option(argv: List[str]) -> Optional[int]:
+    """
+    Worker processes requested with --jobs N (1, the sequential search, by
+    default); None if N is missing or not a positive integer.
+    """
+    if "--jobs" not in argv:
+        return 1
+    try:
+        jobs = int(argv[argv.index("--jobs") + 1])
+    except (IndexError, ValueError):
+        return None
+    return jobs if jobs > 0 else None
+
+
 def main():
     """Main function to solve the grid assignment problem."""
+    jobs = _jobs_option(sys.argv[1:])
+    if jobs is None:
+        print(USAGE, file=sys.stderr)
+        print("error: --jobs needs a positive integer", file=sys.stderr)
+        return 2
+
     # Initialize grid (0 means unassigned)
-    grid = [[0] * SIZE for _ in range(SIZE)]
+    grid = np.zeros(TOTAL_CELLS, dtype=np.int8)
     
     # Set center cell to 13
-    grid[CENTER_ROW][CENTER_COL] = CENTER_VALUE
-    used = {CENTER_VALUE}
+    grid[CENTER_IDX] = CENTER_VALUE
+    used_mask = 1 << CENTER_VALUE
+    
+    # The Cython build needs no compile step, so Numba is not even imported then
+    if "--jit" in sys.argv[1:] and not HAVE_CYTHON and not _use_numba():
+        print("--jit needs Numba; using the plain-Python solver", file=sys.stderr)
+
+    if jobs > 1:
+        solution = solve_parallel(grid, used_mask, jobs)
+        if solution is not None:
+            grid = solution
+        solved = solution is not None
+    else:
+        solved = solve_grid(grid, used_mask)
     
-    # Solve starting from position (0, 0)
-    if solve_grid(grid, used, 0, 0):
+    if solved:
+        if "--verify" in sys.argv[1:] and not verify_grid(grid):
+            print("Solution failed verification", file=sys.stderr)
+            return 1
         solution_str = format_solution(grid)
         print(solution_str)
         return 0
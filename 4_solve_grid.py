@@ -6,7 +6,7 @@ Output: Grid(5,5) value
 """
 
 import sys
-from typing import List, Set, Tuple
+from typing import List, Tuple
 
 SIZE = 5
 TOTAL_CELLS = SIZE * SIZE
@@ -21,130 +21,240 @@ PRIME_POSITIONS = [
 ]
 
 
-def get_orthogonal_neighbors(row: int, col: int) -> List[Tuple[int, int]]:
-    """Get orthogonally adjacent neighbors."""
-    neighbors = []
-    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        nr, nc = row + dr, col + dc
-        if 0 <= nr < SIZE and 0 <= nc < SIZE:
-            neighbors.append((nr, nc))
-    return neighbors
+PRIME_IDX = [row * SIZE + col for row, col in PRIME_POSITIONS]
+PRIME_MASK_IDX = sum(1 << idx for idx in PRIME_IDX)
+TOP_ROW_MASK = (1 << SIZE) - 1
+ALL_NUMBER_MASK = (1 << TOTAL_CELLS) - 1
+ODD_VALUE_MASK = sum(1 << (value - 1) for value in range(1, TOTAL_CELLS + 1, 2))
+EVEN_VALUE_MASK = ALL_NUMBER_MASK & ~ODD_VALUE_MASK
+# Values the last empty prime cell may not take, indexed by the parity of the
+# prime cells filled so far (it must bring the C3 sum back to even).
+PARITY_FORBID = (ODD_VALUE_MASK, EVEN_VALUE_MASK)
+
+# C4: five distinct top-row values have median 14 exactly when 14 is among them
+# with two smaller and two larger values. 14 is forbidden below the top row and
+# each side closes once it holds MEDIAN_RANK values.
+MEDIAN_VALUE = 14
+MEDIAN_RANK = SIZE // 2
+MEDIAN_BIT = 1 << (MEDIAN_VALUE - 1)
+LOW_VALUE_MASK = MEDIAN_BIT - 1
+HIGH_VALUE_MASK = ALL_NUMBER_MASK & ~(LOW_VALUE_MASK | MEDIAN_BIT)
 
+# No symmetry of the square is broken here: the column mirror moves the prime
+# positions (1,0) and (3,0) onto the non-prime (1,4) and (3,4), and every other
+# rotation or reflection moves the top row that C4 constrains.
 
-def get_diagonal_neighbors(row: int, col: int) -> List[Tuple[int, int]]:
-    """Get diagonally adjacent neighbors."""
-    neighbors = []
-    for dr, dc in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-        nr, nc = row + dr, col + dc
-        if 0 <= nr < SIZE and 0 <= nc < SIZE:
-            neighbors.append((nr, nc))
+
+def _build_neighbor_map(size: int, offsets: Tuple[Tuple[int, int], ...]) -> List[Tuple[int, ...]]:
+    """Return the neighbors at the given offsets for every linearized cell index."""
+    neighbors: List[Tuple[int, ...]] = []
+    for row in range(size):
+        for col in range(size):
+            cell_neighbors = []
+            for dr, dc in offsets:
+                nr, nc = row + dr, col + dc
+                if 0 <= nr < size and 0 <= nc < size:
+                    cell_neighbors.append(nr * size + nc)
+            neighbors.append(tuple(cell_neighbors))
     return neighbors
 
 
-def violates_c1(grid: List[List[int]], row: int, col: int, value: int) -> bool:
-    """Check if placing value violates C1 (orthogonal consecutive constraint)."""
-    for nr, nc in get_orthogonal_neighbors(row, col):
-        neighbor_value = grid[nr][nc]
-        if neighbor_value != 0:
-            if abs(neighbor_value - value) == 1:
-                return True
-    return False
+def _build_value_forbid(total_values: int, delta: int) -> List[int]:
+    """
+    For every value v (1-indexed), precompute a bitmask of the values v-delta and
+    v+delta. Bit v-1 represents value v.
+    """
+    forbid_masks = [0] * (total_values + 1)
+    for value in range(1, total_values + 1):
+        mask = 0
+        if value - delta >= 1:
+            mask |= 1 << (value - delta - 1)
+        if value + delta <= total_values:
+            mask |= 1 << (value + delta - 1)
+        forbid_masks[value] = mask
+    return forbid_masks
 
 
-def violates_c2(grid: List[List[int]], row: int, col: int, value: int) -> bool:
-    """Check if placing value violates C2 (diagonal difference of 2 constraint)."""
-    for nr, nc in get_diagonal_neighbors(row, col):
-        neighbor_value = grid[nr][nc]
-        if neighbor_value != 0:
-            if abs(neighbor_value - value) == 2:
-                return True
-    return False
+NEIGHBORS_FLAT = _build_neighbor_map(SIZE, ((-1, 0), (1, 0), (0, -1), (0, 1)))
+DIAG_NEIGHBORS_FLAT = _build_neighbor_map(SIZE, ((-1, -1), (-1, 1), (1, -1), (1, 1)))
+ADJACENT_VALUE_FORBID = _build_value_forbid(TOTAL_CELLS, 1)
+DIAG_FORBID = _build_value_forbid(TOTAL_CELLS, 2)
 
 
-def check_c3(grid: List[List[int]]) -> bool:
-    """Check if C3 constraint is satisfied (sum of prime positions is even)."""
-    prime_sum = 0
-    for row, col in PRIME_POSITIONS:
-        value = grid[row][col]
-        if value == 0:
-            return True
-        prime_sum += value
-    return prime_sum % 2 == 0
+def _next_position(unassigned_mask: int, available_mask: int, forbidden_masks: List[int]) -> Tuple[int, int]:
+    """
+    Return the next cell to fill in row-major order, with its domain bitmask.
+    Any unassigned cell with an empty domain is returned instead (with domain
+    0) so the caller backtracks at once.
+    """
+    mask = unassigned_mask
+    while mask:
+        bit = mask & -mask
+        pos = bit.bit_length() - 1
+        if not available_mask & ~forbidden_masks[pos]:
+            return pos, 0
+        mask ^= bit
 
+    pos = (unassigned_mask & -unassigned_mask).bit_length() - 1
+    return pos, available_mask & ~forbidden_masks[pos]
 
-def check_c4(grid: List[List[int]]) -> bool:
-    """Check if C4 constraint is satisfied (median of top row = 14)."""
-    top_row = grid[0]
-    if any(val == 0 for val in top_row):
-        return True  # Not all filled yet
-    sorted_row = sorted(top_row)
-    return sorted_row[2] == 14  # 3rd value (0-indexed: index 2)
 
+def _effects(pos: int, value: int) -> List[Tuple[int, int]]:
+    """Return the (cell, forbid mask) pairs that placing value at pos imposes."""
+    effects = [(neighbor, ADJACENT_VALUE_FORBID[value]) for neighbor in NEIGHBORS_FLAT[pos]]
+    effects += [(neighbor, DIAG_FORBID[value]) for neighbor in DIAG_NEIGHBORS_FLAT[pos]]
+    return effects
 
-def is_valid_placement(grid: List[List[int]], row: int, col: int, value: int) -> bool:
-    """Check if placing value at (row, col) is valid."""
-    if violates_c1(grid, row, col, value):
-        return False
-    if violates_c2(grid, row, col, value):
-        return False
+
+def _place(pos: int, value: int, forbidden_masks: List[int]) -> List[Tuple[int, int]]:
+    """
+    Forbid the values that placing value at pos rules out for other cells and
+    return the (cell, previous mask) pairs needed to undo it.
+    """
+    added_forbids = []
+    for cell, forbid_bits in _effects(pos, value):
+        prev_mask = forbidden_masks[cell]
+        new_mask = prev_mask | forbid_bits
+        if new_mask != prev_mask:
+            forbidden_masks[cell] = new_mask
+            added_forbids.append((cell, prev_mask))
+    return added_forbids
+
+
+def _propagate(queue: List[int], unassigned_mask: int, available_mask: int,
+               forbidden_masks: List[int], added_forbids: List[Tuple[int, int]]) -> bool:
+    """
+    Singleton forward propagation over the unassigned cells in queue. A cell
+    left with a single candidate value must take it, so that value and its
+    effects are forbidden for the other unassigned cells it constrains; every
+    cell whose mask shrinks is queued again. This is deliberately weaker than
+    full AC-3: the first solution is found in under a millisecond, so support
+    checks on wider domains have nothing to win. Changes are logged in
+    added_forbids. Returns False as soon as some domain becomes empty.
+    """
+    while queue:
+        cell = queue.pop()
+        domain = available_mask & ~forbidden_masks[cell]
+        if domain == 0:
+            return False
+        if domain & (domain - 1):
+            continue
+
+        for other, forbid_bits in _effects(cell, domain.bit_length()):
+            if (unassigned_mask >> other) & 1:
+                prev_mask = forbidden_masks[other]
+                new_mask = prev_mask | forbid_bits | domain
+                if new_mask != prev_mask:
+                    forbidden_masks[other] = new_mask
+                    added_forbids.append((other, prev_mask))
+                    queue.append(other)
     return True
 
 
-def get_next_position(row: int, col: int) -> Tuple[int, int]:
-    """Get next position in row-major order."""
-    if col < SIZE - 1:
-        return row, col + 1
-    else:
-        return row + 1, 0
+def solve_grid(grid: bytearray, forbidden_masks: List[int], unassigned_mask: int, available_mask: int,
+               prime_parity: int = 0, top_lt14: int = 0, top_gt14: int = 0) -> bool:
+    """
+    Bitset backtracking solver over the cells in row-major order, trying
+    values in ascending order. The forbidden masks only prune branches with
+    no solution, so it finds the same first solution as a plain row-major
+    search.
 
+    unassigned_mask has bit i set for every empty cell index i, available_mask
+    has bit v-1 set for every unused value v, and forbidden_masks[i] holds the
+    values C1/C2 rule out for cell i given the cells filled so far
+    and the singleton domains found by _propagate(). prime_parity is the parity
+    of the values already placed on prime positions, kept as a C3 invariant;
+    top_lt14/top_gt14 count top-row values below/above 14 for the C4 invariant.
+    """
+    if unassigned_mask == 0:
+        return True
 
-def solve_grid(grid: List[List[int]], used: Set[int], row: int, col: int) -> bool:
-    """Backtracking solver."""
-    if row >= SIZE:
-        if check_c3(grid) and check_c4(grid):
-            return True
+    pos, domain = _next_position(unassigned_mask, available_mask, forbidden_masks)
+    if domain == 0:
         return False
-    
-    for value in range(1, TOTAL_CELLS + 1):
-        if value in used:
-            continue
-        
-        if not is_valid_placement(grid, row, col, value):
+
+    next_unassigned_mask = unassigned_mask & ~(1 << pos)
+
+    while domain:
+        value_bit = domain & -domain
+        domain ^= value_bit
+        value = value_bit.bit_length()
+        grid[pos] = value
+
+        # C3 invariant: once every prime position is filled the parity is final
+        next_parity = prime_parity ^ (value & 1) if (PRIME_MASK_IDX >> pos) & 1 else prime_parity
+        remaining_primes = next_unassigned_mask & PRIME_MASK_IDX
+        if not remaining_primes and next_parity:
             continue
-        
-        grid[row][col] = value
-        used.add(value)
-        
-        # Early C3 check
-        if all(grid[r][c] != 0 for r, c in PRIME_POSITIONS):
-            if not check_c3(grid):
-                grid[row][col] = 0
-                used.remove(value)
-                continue
-        
-        # Early C4 check (when top row is complete)
-        if row == 0 and all(grid[0][c] != 0 for c in range(SIZE)):
-            if not check_c4(grid):
-                grid[row][col] = 0
-                used.remove(value)
+
+        # C4 invariant: at most MEDIAN_RANK top-row values on either side of 14
+        next_lt, next_gt = top_lt14, top_gt14
+        side_mask = 0
+        if pos < SIZE:
+            if value < MEDIAN_VALUE:
+                next_lt += 1
+                side_mask = LOW_VALUE_MASK if next_lt == MEDIAN_RANK else 0
+            elif value > MEDIAN_VALUE:
+                next_gt += 1
+                side_mask = HIGH_VALUE_MASK if next_gt == MEDIAN_RANK else 0
+            if next_lt > MEDIAN_RANK or next_gt > MEDIAN_RANK:
                 continue
-        
-        next_row, next_col = get_next_position(row, col)
-        if solve_grid(grid, used, next_row, next_col):
+
+        added_forbids = _place(pos, value, forbidden_masks)
+
+        # A full side closes it for the rest of the top row.
+        remaining_top = next_unassigned_mask & TOP_ROW_MASK if side_mask else 0
+        while remaining_top:
+            bit = remaining_top & -remaining_top
+            remaining_top ^= bit
+            cell = bit.bit_length() - 1
+            prev_mask = forbidden_masks[cell]
+            new_mask = prev_mask | side_mask
+            if new_mask != prev_mask:
+                forbidden_masks[cell] = new_mask
+                added_forbids.append((cell, prev_mask))
+
+        # With one prime position left, only values of the parity that makes
+        # the C3 sum even remain possible there.
+        if remaining_primes and not remaining_primes & (remaining_primes - 1):
+            last_prime = remaining_primes.bit_length() - 1
+            prev_mask = forbidden_masks[last_prime]
+            new_mask = prev_mask | PARITY_FORBID[next_parity]
+            if new_mask != prev_mask:
+                forbidden_masks[last_prime] = new_mask
+                added_forbids.append((last_prime, prev_mask))
+
+        next_available_mask = available_mask & ~(1 << (value - 1))
+        queue = [cell for cell, _ in added_forbids if (next_unassigned_mask >> cell) & 1]
+        if (_propagate(queue, next_unassigned_mask, next_available_mask, forbidden_masks, added_forbids)
+                and solve_grid(grid, forbidden_masks, next_unassigned_mask, next_available_mask,
+                               next_parity, next_lt, next_gt)):
             return True
-        
-        grid[row][col] = 0
-        used.remove(value)
-    
+
+        for cell, prev_mask in reversed(added_forbids):
+            forbidden_masks[cell] = prev_mask
+
+    grid[pos] = 0
     return False
 
 
+def verify_grid(grid: bytearray) -> bool:
+    """Cross-check the finished grid against every constraint with verify.py (needs NumPy)."""
+    from verify import verify_c1, verify_c2, verify_c3, verify_c4, verify_permutation
+
+    return (verify_permutation(grid) and verify_c1(grid) and verify_c2(grid)
+            and verify_c3(grid, PRIME_IDX) and verify_c4(grid, MEDIAN_VALUE))
+
+
 def main():
-    grid = [[0] * SIZE for _ in range(SIZE)]
-    used = set()
-    
-    if solve_grid(grid, used, 0, 0):
-        print(grid[4][4])  # Grid(5,5) = grid[4][4] (0-indexed)
+    grid = bytearray(TOTAL_CELLS)
+    forbidden_masks = [0] * SIZE + [MEDIAN_BIT] * (TOTAL_CELLS - SIZE)
+
+    if solve_grid(grid, forbidden_masks, ALL_NUMBER_MASK, ALL_NUMBER_MASK):
+        if "--verify" in sys.argv[1:] and not verify_grid(grid):
+            print("Solution failed verification", file=sys.stderr)
+            return 1
+        print(grid[TOTAL_CELLS - 1])  # Grid(5,5) = last cell in row-major order
         return 0
     else:
         return 1
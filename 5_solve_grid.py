@@ -6,7 +6,7 @@ Output: Comma-separated string of 36 integers
 """
 
 import sys
-from typing import List, Set, Tuple
+from typing import List, Tuple
 
 SIZE = 6
 TOTAL_CELLS = SIZE * SIZE
@@ -19,107 +19,193 @@ FIXED_ROW, FIXED_COL = 0, 0
 FIXED_VALUE = 1
 
 
-def get_orthogonal_neighbors(row: int, col: int) -> List[Tuple[int, int]]:
-    """Get orthogonally adjacent neighbors."""
-    neighbors = []
-    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        nr, nc = row + dr, col + dc
-        if 0 <= nr < SIZE and 0 <= nc < SIZE:
-            neighbors.append((nr, nc))
+FIXED_IDX = FIXED_ROW * SIZE + FIXED_COL
+ALL_NUMBER_MASK = (1 << TOTAL_CELLS) - 1
+SPECIAL_VALUE_MASK = sum(1 << (value - 1) for value in SPECIAL_NUMBERS)
+
+def _build_neighbor_map(size: int) -> List[Tuple[int, ...]]:
+    """Return orthogonal neighbors for every linearized cell index."""
+    neighbors: List[Tuple[int, ...]] = []
+    for row in range(size):
+        for col in range(size):
+            cell_neighbors = []
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                nr, nc = row + dr, col + dc
+                if 0 <= nr < size and 0 <= nc < size:
+                    cell_neighbors.append(nr * size + nc)
+            neighbors.append(tuple(cell_neighbors))
     return neighbors
 
 
-def violates_c1(grid: List[List[int]], row: int, col: int, value: int) -> bool:
-    """Check if placing value violates C1 (orthogonal consecutive constraint)."""
-    for nr, nc in get_orthogonal_neighbors(row, col):
-        neighbor_value = grid[nr][nc]
-        if neighbor_value != 0:
-            if abs(neighbor_value - value) == 1:
-                return True
-    return False
+def _build_rook_peers(size: int) -> List[Tuple[int, ...]]:
+    """Return the other cells sharing a row or column with every linearized cell index."""
+    peers: List[Tuple[int, ...]] = []
+    for row in range(size):
+        for col in range(size):
+            idx = row * size + col
+            row_cells = [row * size + c for c in range(size)]
+            col_cells = [r * size + col for r in range(size)]
+            peers.append(tuple(cell for cell in row_cells + col_cells if cell != idx))
+    return peers
+
+
+def _build_adjacent_value_forbid(total_values: int) -> List[int]:
+    """
+    For every value v (1-indexed), precompute a bitmask containing the values
+    that cannot be placed in an orthogonal neighbor (i.e. v-1 and/or v+1).
+    """
+    forbid_masks = [0] * (total_values + 1)
+    for value in range(1, total_values + 1):
+        mask = 0
+        if value > 1:
+            mask |= 1 << (value - 2)
+        if value < total_values:
+            mask |= 1 << value
+        forbid_masks[value] = mask
+    return forbid_masks
+
+
+NEIGHBORS_FLAT = _build_neighbor_map(SIZE)
+ROOK_PEERS = _build_rook_peers(SIZE)
+ADJACENT_VALUE_FORBID = _build_adjacent_value_forbid(TOTAL_CELLS)
+
+
+def _next_position(unassigned_mask: int, available_mask: int, forbidden_masks: List[int]) -> Tuple[int, int]:
+    """
+    Return the next cell to fill in row-major order, with its domain bitmask.
+    Any unassigned cell with an empty domain is returned instead (with domain
+    0) so the caller backtracks at once.
+    """
+    mask = unassigned_mask
+    while mask:
+        bit = mask & -mask
+        pos = bit.bit_length() - 1
+        if not available_mask & ~forbidden_masks[pos]:
+            return pos, 0
+        mask ^= bit
+
+    pos = (unassigned_mask & -unassigned_mask).bit_length() - 1
+    return pos, available_mask & ~forbidden_masks[pos]
+
+
+def _effects(pos: int, value: int) -> List[Tuple[int, int]]:
+    """Return the (cell, forbid mask) pairs that placing value at pos imposes."""
+    effects = [(neighbor, ADJACENT_VALUE_FORBID[value]) for neighbor in NEIGHBORS_FLAT[pos]]
+    if value in SPECIAL_NUMBERS:
+        effects += [(peer, SPECIAL_VALUE_MASK) for peer in ROOK_PEERS[pos]]
+    return effects
+
+
+def _place(pos: int, value: int, forbidden_masks: List[int]) -> List[Tuple[int, int]]:
+    """
+    Forbid the values that placing value at pos rules out for other cells and
+    return the (cell, previous mask) pairs needed to undo it.
+    """
+    added_forbids = []
+    for cell, forbid_bits in _effects(pos, value):
+        prev_mask = forbidden_masks[cell]
+        new_mask = prev_mask | forbid_bits
+        if new_mask != prev_mask:
+            forbidden_masks[cell] = new_mask
+            added_forbids.append((cell, prev_mask))
+    return added_forbids
+
+
+def _propagate(queue: List[int], unassigned_mask: int, available_mask: int,
+               forbidden_masks: List[int], added_forbids: List[Tuple[int, int]]) -> bool:
+    """
+    Singleton forward propagation over the unassigned cells in queue. A cell
+    left with a single candidate value must take it, so that value and its
+    effects are forbidden for the other unassigned cells it constrains; every
+    cell whose mask shrinks is queued again. This is deliberately weaker than
+    full AC-3: the first solution is found in under a millisecond, so support
+    checks on wider domains have nothing to win. Changes are logged in
+    added_forbids. Returns False as soon as some domain becomes empty.
+    """
+    while queue:
+        cell = queue.pop()
+        domain = available_mask & ~forbidden_masks[cell]
+        if domain == 0:
+            return False
+        if domain & (domain - 1):
+            continue
 
+        for other, forbid_bits in _effects(cell, domain.bit_length()):
+            if (unassigned_mask >> other) & 1:
+                prev_mask = forbidden_masks[other]
+                new_mask = prev_mask | forbid_bits | domain
+                if new_mask != prev_mask:
+                    forbidden_masks[other] = new_mask
+                    added_forbids.append((other, prev_mask))
+                    queue.append(other)
+    return True
 
-def violates_c5(grid: List[List[int]], row: int, col: int, value: int) -> bool:
-    """Check if placing value violates C5 (Rook constraint)."""
-    if value not in SPECIAL_NUMBERS:
-        return False
-    
-    # Check same row
-    for c in range(SIZE):
-        if c != col and grid[row][c] != 0:
-            if grid[row][c] in SPECIAL_NUMBERS:
-                return True
-    
-    # Check same column
-    for r in range(SIZE):
-        if r != row and grid[r][col] != 0:
-            if grid[r][col] in SPECIAL_NUMBERS:
-                return True
-    
-    return False
 
+def solve_grid(grid: bytearray, forbidden_masks: List[int], unassigned_mask: int, available_mask: int) -> bool:
+    """
+    Bitset backtracking solver over the cells in row-major order, trying
+    values in ascending order. The forbidden masks only prune branches with
+    no solution, so it finds the same first solution as a plain row-major
+    search.
 
-def is_valid_placement(grid: List[List[int]], row: int, col: int, value: int) -> bool:
-    """Check if placing value at (row, col) is valid."""
-    if violates_c1(grid, row, col, value):
-        return False
-    if violates_c5(grid, row, col, value):
-        return False
-    return True
+    unassigned_mask has bit i set for every empty cell index i, available_mask
+    has bit v-1 set for every unused value v, and forbidden_masks[i] holds the
+    values C1/C5 rule out for cell i given the cells filled so far
+    and the singleton domains found by _propagate().
+    """
+    if unassigned_mask == 0:
+        return True
 
+    pos, domain = _next_position(unassigned_mask, available_mask, forbidden_masks)
+    if domain == 0:
+        return False
 
-def get_next_position(row: int, col: int) -> Tuple[int, int]:
-    """Get next position in row-major order."""
-    if col < SIZE - 1:
-        return row, col + 1
-    else:
-        return row + 1, 0
+    next_unassigned_mask = unassigned_mask & ~(1 << pos)
+
+    while domain:
+        value_bit = domain & -domain
+        domain ^= value_bit
+        value = value_bit.bit_length()
+        grid[pos] = value
+        added_forbids = _place(pos, value, forbidden_masks)
+        next_available_mask = available_mask & ~(1 << (value - 1))
+        queue = [cell for cell, _ in added_forbids if (next_unassigned_mask >> cell) & 1]
+        if (_propagate(queue, next_unassigned_mask, next_available_mask, forbidden_masks, added_forbids)
+                and solve_grid(grid, forbidden_masks, next_unassigned_mask, next_available_mask)):
+            return True
 
+        for cell, prev_mask in reversed(added_forbids):
+            forbidden_masks[cell] = prev_mask
 
-def solve_grid(grid: List[List[int]], used: Set[int], row: int, col: int) -> bool:
-    """Backtracking solver."""
-    if row >= SIZE:
-        return True
-    
-    # Skip fixed cell
-    if row == FIXED_ROW and col == FIXED_COL:
-        next_row, next_col = get_next_position(row, col)
-        return solve_grid(grid, used, next_row, next_col)
-    
-    for value in range(1, TOTAL_CELLS + 1):
-        if value in used:
-            continue
-        
-        if not is_valid_placement(grid, row, col, value):
-            continue
-        
-        grid[row][col] = value
-        used.add(value)
-        
-        next_row, next_col = get_next_position(row, col)
-        if solve_grid(grid, used, next_row, next_col):
-            return True
-        
-        grid[row][col] = 0
-        used.remove(value)
-    
+    grid[pos] = 0
     return False
 
 
-def format_solution(grid: List[List[int]]) -> str:
+def format_solution(grid: bytearray) -> str:
     """Format solution as comma-separated string (row by row, left to right)."""
-    result = []
-    for row in grid:
-        result.extend(str(val) for val in row)
-    return ",".join(result)
+    return ",".join(map(str, grid))
+
+
+def verify_grid(grid: bytearray) -> bool:
+    """Cross-check the finished grid against every constraint with verify.py (needs NumPy)."""
+    from verify import verify_c1, verify_c5, verify_permutation
+
+    return (grid[FIXED_IDX] == FIXED_VALUE and verify_permutation(grid) and verify_c1(grid)
+            and verify_c5(grid, SPECIAL_NUMBERS))
 
 
 def main():
-    grid = [[0] * SIZE for _ in range(SIZE)]
-    grid[FIXED_ROW][FIXED_COL] = FIXED_VALUE
-    used = {FIXED_VALUE}
-    
-    if solve_grid(grid, used, 0, 0):
+    grid = bytearray(TOTAL_CELLS)
+    forbidden_masks = [0] * TOTAL_CELLS
+    grid[FIXED_IDX] = FIXED_VALUE
+    _place(FIXED_IDX, FIXED_VALUE, forbidden_masks)
+    unassigned_mask = ((1 << TOTAL_CELLS) - 1) & ~(1 << FIXED_IDX)
+    available_mask = ALL_NUMBER_MASK & ~(1 << (FIXED_VALUE - 1))
+
+    if solve_grid(grid, forbidden_masks, unassigned_mask, available_mask):
+        if "--verify" in sys.argv[1:] and not verify_grid(grid):
+            print("Solution failed verification", file=sys.stderr)
+            return 1
         print(format_solution(grid))
         return 0
     else:
@@ -0,0 +1,13 @@
+"""
+Builds the optional Cython kernels used by 3_solve_grid.py and 6_solve_grid.py.
+
+    python setup.py build_ext --inplace
+"""
+
+from Cython.Build import cythonize
+from setuptools import setup
+
+setup(
+    name="gco-november-2025",
+    ext_modules=cythonize(["three_solve_bitset.pyx", "six_solve_bitset.pyx"], language_level=3),
+)
@@ -0,0 +1,244 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Ahead-of-time (Cython) build of the problem 6 counting kernel.
+
+count_from() mirrors _count() in 6_solve_grid.py: the explicit-stack bitset
+DFS with MRV selection, singleton propagation and the symmetry-breaking order
+links. The CSR tables are built by 6_solve_grid.py, which falls back to its
+Numba or pure-Python solvers when this extension is not compiled.
+
+Build in place with: python setup.py build_ext --inplace
+"""
+
+from libc.stdlib cimport free, malloc
+
+# De Bruijn table mapping (lowest set bit * 0x077CB531) >> 27 to its index.
+cdef int DEBRUIJN_CTZ[32]
+DEBRUIJN_CTZ[:] = [
+    0, 1, 28, 2, 29, 14, 24, 3, 30, 22, 20, 15, 25, 17, 4, 8,
+    31, 27, 13, 23, 21, 19, 16, 7, 26, 12, 18, 6, 11, 5, 10, 9,
+]
+
+
+cdef inline int _ctz(long long bit) noexcept nogil:
+    """Index of a single set bit (bit must be a power of two below 2**32)."""
+    return DEBRUIJN_CTZ[((bit * 0x077CB531) & 0xFFFFFFFFLL) >> 27]
+
+
+cdef inline int _popcount(long long x) noexcept nogil:
+    """SWAR population count for masks below 2**32."""
+    x = x - ((x >> 1) & 0x55555555)
+    x = (x & 0x33333333) + ((x >> 2) & 0x33333333)
+    x = (x + (x >> 4)) & 0x0F0F0F0F
+    return <int>(((x * 0x01010101) & 0xFFFFFFFFLL) >> 24)
+
+
+cdef long long count_dfs(int total_cells, const int* neighbors_flat, const int* neighbors_off,
+                         const long long* forbid_table, const int* links_cell, const int* links_off,
+                         const long long* links_forbid, int start_pos, int start_value) noexcept nogil:
+    """
+    Count the symmetry-orbit representatives with start_value at start_pos.
+    links_forbid is row-major with total_cells + 1 entries per link. Returns -1
+    if the work buffers cannot be allocated.
+    """
+    cdef int row = total_cells + 1
+    cdef int undo_capacity = total_cells * total_cells
+    cdef long long all_mask = (1LL << total_cells) - 1
+
+    cdef long long* forbidden_masks = <long long*> malloc(total_cells * sizeof(long long))
+    cdef int* undo_pos = <int*> malloc(undo_capacity * sizeof(int))
+    cdef long long* undo_prev = <long long*> malloc(undo_capacity * sizeof(long long))
+    cdef int* queue = <int*> malloc(undo_capacity * sizeof(int))
+    cdef int* undo_top_stack = <int*> malloc(row * sizeof(int))
+    cdef int* pos_stack = <int*> malloc(row * sizeof(int))
+    cdef long long* domain_stack = <long long*> malloc(row * sizeof(long long))
+    cdef long long* unassigned_stack = <long long*> malloc(row * sizeof(long long))
+    cdef long long* available_stack = <long long*> malloc(row * sizeof(long long))
+
+    cdef long long total = -1
+    cdef long long unassigned_mask, available_mask, next_unassigned_mask, next_available_mask
+    cdef long long mask, bit, domain, best_domain, value_bit, forbid_bits, prev_mask, new_mask
+    cdef int depth, undo_top, undo_target, queue_top, pos, best_pos, best_size, domain_size
+    cdef int value, k, cell, neighbor, partner
+    cdef bint descending, consistent
+    cdef bint allocated = (
+        forbidden_masks != NULL and undo_pos != NULL and undo_prev != NULL and queue != NULL
+        and undo_top_stack != NULL and pos_stack != NULL and domain_stack != NULL
+        and unassigned_stack != NULL and available_stack != NULL
+    )
+
+    if allocated:
+        for k in range(total_cells):
+            forbidden_masks[k] = 0
+
+        # The root is a one-value domain at start_pos; entering it through the
+        # rollback branch places that value before the search proper begins.
+        unassigned_stack[0] = all_mask
+        available_stack[0] = all_mask
+        pos_stack[0] = start_pos
+        domain_stack[0] = 1LL << (start_value - 1)
+        undo_top_stack[0] = 0
+        undo_top = 0
+        depth = 0
+        descending = False
+        total = 0
+
+        while depth >= 0:
+            if descending:
+                unassigned_mask = unassigned_stack[depth]
+                if unassigned_mask == 0:
+                    total += 1
+                    descending = False
+                    depth -= 1
+                    continue
+
+                # Minimum-remaining-values selection.
+                available_mask = available_stack[depth]
+                best_pos = -1
+                best_domain = 0
+                best_size = total_cells + 1
+                mask = unassigned_mask
+                while mask:
+                    bit = mask & -mask
+                    pos = _ctz(bit)
+                    domain = available_mask & ~forbidden_masks[pos]
+                    domain_size = _popcount(domain)
+                    if domain_size == 0:
+                        best_domain = 0
+                        break
+                    if domain_size < best_size:
+                        best_size = domain_size
+                        best_pos = pos
+                        best_domain = domain
+                        if domain_size == 1:
+                            break
+                    mask ^= bit
+
+                if best_domain == 0:
+                    descending = False
+                    depth -= 1
+                    continue
+
+                pos_stack[depth] = best_pos
+                domain_stack[depth] = best_domain
+                undo_top_stack[depth] = undo_top
+            else:
+                # Returning from a child: roll back the forbids it added.
+                undo_target = undo_top_stack[depth]
+                while undo_top > undo_target:
+                    undo_top -= 1
+                    forbidden_masks[undo_pos[undo_top]] = undo_prev[undo_top]
+                if domain_stack[depth] == 0:
+                    depth -= 1
+                    continue
+
+            domain = domain_stack[depth]
+            value_bit = domain & -domain
+            domain_stack[depth] = domain ^ value_bit
+            pos = pos_stack[depth]
+            value = _ctz(value_bit) + 1
+            forbid_bits = forbid_table[value]
+
+            for k in range(neighbors_off[pos], neighbors_off[pos + 1]):
+                neighbor = neighbors_flat[k]
+                prev_mask = forbidden_masks[neighbor]
+                new_mask = prev_mask | forbid_bits
+                if new_mask != prev_mask:
+                    forbidden_masks[neighbor] = new_mask
+                    undo_pos[undo_top] = neighbor
+                    undo_prev[undo_top] = prev_mask
+                    undo_top += 1
+            for k in range(links_off[pos], links_off[pos + 1]):
+                partner = links_cell[k]
+                prev_mask = forbidden_masks[partner]
+                new_mask = prev_mask | links_forbid[k * row + value]
+                if new_mask != prev_mask:
+                    forbidden_masks[partner] = new_mask
+                    undo_pos[undo_top] = partner
+                    undo_prev[undo_top] = prev_mask
+                    undo_top += 1
+
+            # Singleton propagation.
+            next_unassigned_mask = unassigned_stack[depth] & ~(1LL << pos)
+            next_available_mask = available_stack[depth] ^ value_bit
+            queue_top = 0
+            for k in range(undo_top_stack[depth], undo_top):
+                cell = undo_pos[k]
+                if (next_unassigned_mask >> cell) & 1:
+                    queue[queue_top] = cell
+                    queue_top += 1
+            consistent = True
+            while queue_top > 0:
+                queue_top -= 1
+                cell = queue[queue_top]
+                domain = next_available_mask & ~forbidden_masks[cell]
+                if domain == 0:
+                    consistent = False
+                    break
+                if domain & (domain - 1):
+                    continue
+                value = _ctz(domain) + 1
+                forbid_bits = forbid_table[value] | domain
+                for k in range(neighbors_off[cell], neighbors_off[cell + 1]):
+                    neighbor = neighbors_flat[k]
+                    if (next_unassigned_mask >> neighbor) & 1:
+                        prev_mask = forbidden_masks[neighbor]
+                        new_mask = prev_mask | forbid_bits
+                        if new_mask != prev_mask:
+                            forbidden_masks[neighbor] = new_mask
+                            undo_pos[undo_top] = neighbor
+                            undo_prev[undo_top] = prev_mask
+                            undo_top += 1
+                            queue[queue_top] = neighbor
+                            queue_top += 1
+                for k in range(links_off[cell], links_off[cell + 1]):
+                    partner = links_cell[k]
+                    if (next_unassigned_mask >> partner) & 1:
+                        prev_mask = forbidden_masks[partner]
+                        new_mask = prev_mask | links_forbid[k * row + value] | domain
+                        if new_mask != prev_mask:
+                            forbidden_masks[partner] = new_mask
+                            undo_pos[undo_top] = partner
+                            undo_prev[undo_top] = prev_mask
+                            undo_top += 1
+                            queue[queue_top] = partner
+                            queue_top += 1
+
+            if not consistent:
+                # Stay at this depth: the rollback branch undoes and tries the next value.
+                descending = False
+                continue
+
+            unassigned_stack[depth + 1] = next_unassigned_mask
+            available_stack[depth + 1] = next_available_mask
+            depth += 1
+            descending = True
+
+    free(forbidden_masks)
+    free(undo_pos)
+    free(undo_prev)
+    free(queue)
+    free(undo_top_stack)
+    free(pos_stack)
+    free(domain_stack)
+    free(unassigned_stack)
+    free(available_stack)
+    return total
+
+
+def count_from(const int[::1] neighbors_flat, const int[::1] neighbors_off, const long long[::1] forbid_table,
+               const int[::1] links_cell, const int[::1] links_off, const long long[::1] links_forbid,
+               int start_pos, int start_value):
+    """
+    Count the symmetry-orbit representatives with start_value at start_pos.
+    Arguments are the CSR tables from 6_solve_grid._kernel_tables(); the
+    search itself runs without the GIL.
+    """
+    cdef int total_cells = neighbors_off.shape[0] - 1
+    cdef long long total
+    with nogil:
+        total = count_dfs(total_cells, &neighbors_flat[0], &neighbors_off[0], &forbid_table[0],
+                          &links_cell[0], &links_off[0], &links_forbid[0], start_pos, start_value)
+    if total < 0:
+        raise MemoryError("could not allocate the search buffers")
+    return total
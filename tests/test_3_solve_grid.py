@@ -0,0 +1,84 @@
+"""
+Check that every problem 3 search path finds the same grid.
+
+solve_from() in plain Python is the reference; the Numba (--jit) and Cython
+builds and the process-pool split in solve_parallel() must return the same
+grid, and that grid must pass the NumPy cross-checks in verify.py.
+
+Run with: python -m unittest discover tests
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXPECTED = "9,1,11,2,14,4,16,5,17,19,15,8,13,6,21,3,18,7,20,23,22,10,24,12,25"
+
+
+def _load_solver(name: str):
+    """Import a fresh copy of 3_solve_grid.py as module name."""
+    # The Cython extension and verify.py live in the repo root; Numba needs the
+    # module registered in sys.modules to cache the kernel.
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, "3_solve_grid.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class SolveGridTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.solver = _load_solver("three_solve_grid")
+        grid, used_mask = cls._start(cls.solver)
+        assert cls.solver.solve_from(grid, used_mask, 0)
+        cls.expected = grid
+
+    @staticmethod
+    def _start(solver):
+        """The empty grid with only the fixed center, and its used-value mask."""
+        grid = solver.np.zeros(solver.TOTAL_CELLS, dtype=solver.np.int8)
+        grid[solver.CENTER_IDX] = solver.CENTER_VALUE
+        return grid, 1 << solver.CENTER_VALUE
+
+    def assertSameGrid(self, grid):
+        self.assertEqual(grid.tolist(), self.expected.tolist())
+
+    def test_reference_answer(self):
+        self.assertEqual(self.solver.format_solution(self.expected), EXPECTED)
+        self.assertTrue(self.solver.verify_grid(self.expected))
+
+    def test_solve_grid(self):
+        grid, used_mask = self._start(self.solver)
+        self.assertTrue(self.solver.solve_grid(grid, used_mask))
+        self.assertSameGrid(grid)
+
+    def test_solve_from_aot(self):
+        if not self.solver.HAVE_CYTHON:
+            self.skipTest("three_solve_bitset is not built (python setup.py build_ext --inplace)")
+        grid, used_mask = self._start(self.solver)
+        self.assertTrue(self.solver.solve_from_aot(grid, used_mask, 0))
+        self.assertSameGrid(grid)
+
+    def test_solve_from_jit(self):
+        # _use_numba() rebinds module globals, so it gets its own copy.
+        solver = _load_solver("three_solve_grid_jit")
+        if not solver._use_numba():
+            self.skipTest("Numba is not installed")
+        grid, used_mask = self._start(solver)
+        self.assertTrue(solver.solve_from(grid, used_mask, 0))
+        self.assertSameGrid(grid)
+
+    def test_solve_parallel(self):
+        grid, used_mask = self._start(self.solver)
+        solution = self.solver.solve_parallel(grid, used_mask, processes=2)
+        self.assertIsNotNone(solution)
+        self.assertSameGrid(solution)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Problem 4 regression test: the solver's answer and its constraint cross-check.
+
+The expected Grid(5,5) value is the one the original row-major search printed;
+the bitset solver must find the same first solution.
+
+Run with: python -m unittest discover tests
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXPECTED = 24
+
+
+def _load_solver():
+    """Import 4_solve_grid.py (its name is not a valid module name)."""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)  # verify.py
+    spec = importlib.util.spec_from_file_location("four_solve_grid", os.path.join(REPO_ROOT, "4_solve_grid.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class SolveGridTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.solver = _load_solver()
+
+    def test_solve_grid(self):
+        solver = self.solver
+        grid = bytearray(solver.TOTAL_CELLS)
+        forbidden_masks = [0] * solver.SIZE + [solver.MEDIAN_BIT] * (solver.TOTAL_CELLS - solver.SIZE)
+        self.assertTrue(solver.solve_grid(grid, forbidden_masks, solver.ALL_NUMBER_MASK, solver.ALL_NUMBER_MASK))
+        self.assertEqual(grid[solver.TOTAL_CELLS - 1], EXPECTED)
+        self.assertTrue(solver.verify_grid(grid))
+
+    def test_main(self):
+        output = io.StringIO()
+        with mock.patch.object(sys, "argv", ["4_solve_grid.py", "--verify"]), contextlib.redirect_stdout(output):
+            self.assertEqual(self.solver.main(), 0)
+        self.assertEqual(output.getvalue().strip(), str(EXPECTED))
+
+
+if __name__ == "__main__":
+    unittest.main()
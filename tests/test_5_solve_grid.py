@@ -0,0 +1,57 @@
+"""
+Problem 5 regression test: the solver's answer and its constraint cross-check.
+
+The expected grid is the one the original row-major search printed; the bitset
+solver must find the same first solution.
+
+Run with: python -m unittest discover tests
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXPECTED = "1,3,5,2,4,6,7,9,11,8,10,12,13,15,17,14,16,18,19,21,23,20,22,25,26,24,27,29,31,28,30,32,34,36,33,35"
+
+
+def _load_solver():
+    """Import 5_solve_grid.py (its name is not a valid module name)."""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)  # verify.py
+    spec = importlib.util.spec_from_file_location("five_solve_grid", os.path.join(REPO_ROOT, "5_solve_grid.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class SolveGridTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.solver = _load_solver()
+
+    def test_solve_grid(self):
+        solver = self.solver
+        grid = bytearray(solver.TOTAL_CELLS)
+        forbidden_masks = [0] * solver.TOTAL_CELLS
+        grid[solver.FIXED_IDX] = solver.FIXED_VALUE
+        solver._place(solver.FIXED_IDX, solver.FIXED_VALUE, forbidden_masks)
+        unassigned_mask = ((1 << solver.TOTAL_CELLS) - 1) & ~(1 << solver.FIXED_IDX)
+        available_mask = solver.ALL_NUMBER_MASK & ~(1 << (solver.FIXED_VALUE - 1))
+        self.assertTrue(solver.solve_grid(grid, forbidden_masks, unassigned_mask, available_mask))
+        self.assertEqual(solver.format_solution(grid), EXPECTED)
+        self.assertTrue(solver.verify_grid(grid))
+
+    def test_main(self):
+        output = io.StringIO()
+        with mock.patch.object(sys, "argv", ["5_solve_grid.py", "--verify"]), contextlib.redirect_stdout(output):
+            self.assertEqual(self.solver.main(), 0)
+        self.assertEqual(output.getvalue().strip(), EXPECTED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Cross-check every problem 6 counting path against brute force on a 3x3 grid.
+
+6_solve_grid.py builds its tables for SIZE = 5 at import, so the test loads a
+copy of the script with SIZE = 3 from a temporary directory. count_from() is
+the table-driven reference; the generated, Numba and Cython paths must all
+agree with it and with the brute-force count, both per subtree and through the
+pooled count_valid_grids*() entry points.
+
+Run with: python -m unittest discover tests
+"""
+
+import importlib.util
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ORACLE_SIZE = 3
+
+
+def _load_solver(size: int, directory: str):
+    """Import 6_solve_grid.py with its SIZE constant replaced by size, from a copy in directory."""
+    with open(os.path.join(REPO_ROOT, "6_solve_grid.py")) as f:
+        source = f.read()
+    assert "\nSIZE = 5\n" in source
+    source = source.replace("\nSIZE = 5\n", f"\nSIZE = {size}\n", 1)
+
+    path = os.path.join(directory, f"six_solve_grid_{size}.py")
+    with open(path, "w") as f:
+        f.write(source)
+
+    # The Cython extension lives in the repo root; Numba needs the module
+    # registered in sys.modules to cache the kernel.
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    name = f"six_solve_grid_{size}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _brute_force_count(size: int) -> int:
+    """Number of permutations of 1..size*size with no orthogonally adjacent consecutive values."""
+    edges = [(r * size + c, r * size + c + 1) for r in range(size) for c in range(size - 1)]
+    edges += [(r * size + c, (r + 1) * size + c) for r in range(size - 1) for c in range(size)]
+    return sum(
+        all(abs(grid[a] - grid[b]) != 1 for a, b in edges)
+        for grid in itertools.permutations(range(1, size * size + 1))
+    )
+
+
+class CountValidGridsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.mkdtemp(prefix="six_solve_grid_")
+        cls.addClassCleanup(shutil.rmtree, directory, ignore_errors=True)
+        cls.solver = _load_solver(ORACLE_SIZE, directory)
+        cls.expected = _brute_force_count(ORACLE_SIZE)
+
+    def _count(self, count_fn) -> int:
+        """count_valid_grids() for one counting path, without the process pool."""
+        tasks = self.solver._root_tasks()
+        return self.solver.SYMMETRY_FACTOR * sum(count_fn(pos, value) for pos, value in tasks)
+
+    def test_brute_force(self):
+        self.assertEqual(self.expected, 12072)
+
+    def test_count_from(self):
+        self.assertEqual(self._count(self.solver.count_from), self.expected)
+
+    def test_count_from_gen(self):
+        self.assertEqual(self._count(self.solver.count_from_gen), self.expected)
+
+    def test_count_from_jit(self):
+        if not self.solver.HAVE_NUMBA:
+            self.skipTest("Numba is not installed")
+        self.assertEqual(self._count(self.solver.count_from_jit), self.expected)
+
+    def test_count_from_aot(self):
+        if not self.solver.HAVE_CYTHON:
+            self.skipTest("six_solve_bitset is not built (python setup.py build_ext --inplace)")
+        self.assertEqual(self._count(self.solver.count_from_aot), self.expected)
+
+    def test_count_valid_grids(self):
+        self.assertEqual(self.solver.count_valid_grids(2), self.expected)
+
+    def test_count_valid_grids_jit(self):
+        if not self.solver.HAVE_NUMBA:
+            self.skipTest("Numba is not installed")
+        self.assertEqual(self.solver.count_valid_grids_jit(2), self.expected)
+
+    def test_count_valid_grids_aot(self):
+        if not self.solver.HAVE_CYTHON:
+            self.skipTest("six_solve_bitset is not built (python setup.py build_ext --inplace)")
+        self.assertEqual(self.solver.count_valid_grids_aot(2), self.expected)
+
+    def test_subtrees_agree(self):
+        counters = [self.solver.count_from, self.solver.count_from_gen]
+        if self.solver.HAVE_NUMBA:
+            counters.append(self.solver.count_from_jit)
+        if self.solver.HAVE_CYTHON:
+            counters.append(self.solver.count_from_aot)
+        for pos, value in self.solver._root_tasks():
+            counts = [count_fn(pos, value) for count_fn in counters]
+            self.assertEqual(len(set(counts)), 1, f"subtree {value} at cell {pos}: {counts}")
+
+
+if __name__ == "__main__":
+    unittest.main()
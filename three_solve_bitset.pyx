@@ -0,0 +1,130 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Ahead-of-time (Cython) build of the problem 3 solver.
+
+solve_from() mirrors solve_from() in 3_solve_grid.py: the explicit-loop
+backtracking over the static fill order with used-value and C1/C2 forbid
+masks, the running C3 parity and the row-mirror symmetry breaking. The tables
+are built by 3_solve_grid.py, which falls back to its Numba or pure-Python
+solver when this extension is not compiled.
+
+Build in place with: python setup.py build_ext --inplace
+"""
+
+from libc.stdlib cimport free, malloc
+
+# De Bruijn table mapping (lowest set bit * 0x077CB531) >> 27 to its index.
+cdef int DEBRUIJN_CTZ[32]
+DEBRUIJN_CTZ[:] = [
+    0, 1, 28, 2, 29, 14, 24, 3, 30, 22, 20, 15, 25, 17, 4, 8,
+    31, 27, 13, 23, 21, 19, 16, 7, 26, 12, 18, 6, 11, 5, 10, 9,
+]
+
+
+cdef inline int _ctz(long long bit) noexcept nogil:
+    """Index of a single set bit (bit must be a power of two below 2**32)."""
+    return DEBRUIJN_CTZ[((bit * 0x077CB531) & 0xFFFFFFFFLL) >> 27]
+
+
+cdef int solve_dfs(signed char* grid, long long used_mask, int start_depth, const long long* order,
+                   int order_len, const long long* is_prime, const long long* neigh_ortho,
+                   const long long* neigh_diag, int neigh_width, const long long* ortho_forbid,
+                   const long long* diag_forbid, const long long* parity_values,
+                   const long long* corner_above, int prime_count, long long all_values_mask) noexcept nogil:
+    """
+    Fill order[start_depth:] in place. neigh_ortho and neigh_diag are row-major
+    with neigh_width entries per cell, padded with -1. Returns 1 if a solution
+    was found, 0 if not and -1 if the work buffer cannot be allocated.
+    """
+    cdef int* last = <int*> malloc(order_len * sizeof(int))
+    if last == NULL:
+        return -1
+
+    cdef int depth, pos, value, k, n, idx, above
+    cdef int prime_filled = 0
+    cdef int prime_parity = 0
+    cdef long long candidates, forbidden, bit
+    cdef int solved = 0
+
+    for k in range(order_len):
+        last[k] = 0
+    for k in range(order_len):
+        idx = order[k]
+        if is_prime[idx] and grid[idx]:
+            prime_filled += 1
+            prime_parity ^= grid[idx] & 1
+
+    depth = start_depth
+    while True:
+        if depth == order_len:
+            solved = 1
+            break
+        pos = order[depth]
+
+        # Coming back to pos: take its current value off before trying the next
+        value = last[depth]
+        if value:
+            grid[pos] = 0
+            used_mask ^= 1LL << value
+            if is_prime[pos]:
+                prime_filled -= 1
+                prime_parity ^= value & 1
+
+        forbidden = 0
+        for k in range(neigh_width):
+            n = neigh_ortho[pos * neigh_width + k]
+            if n < 0:
+                break
+            forbidden |= ortho_forbid[grid[n]]
+        for k in range(neigh_width):
+            n = neigh_diag[pos * neigh_width + k]
+            if n < 0:
+                break
+            forbidden |= diag_forbid[grid[n]]
+
+        candidates = all_values_mask & ~used_mask & ~forbidden & ~((2LL << value) - 1)
+        if is_prime[pos] and prime_filled == prime_count - 1:
+            candidates &= parity_values[prime_parity]
+        above = corner_above[pos]
+        if above >= 0:
+            candidates &= ~((2LL << grid[above]) - 1)
+
+        if not candidates:
+            last[depth] = 0
+            depth -= 1
+            if depth < start_depth:
+                break
+            continue
+
+        bit = candidates & -candidates
+        value = _ctz(bit)
+        grid[pos] = <signed char> value
+        used_mask |= bit
+        last[depth] = value
+        if is_prime[pos]:
+            prime_filled += 1
+            prime_parity ^= value & 1
+        depth += 1
+
+    free(last)
+    return solved
+
+
+def solve_from(signed char[::1] grid, long long used_mask, int start_depth, const long long[::1] order,
+               const long long[::1] is_prime, const long long[:, ::1] neigh_ortho,
+               const long long[:, ::1] neigh_diag, const long long[::1] ortho_forbid,
+               const long long[::1] diag_forbid, const long long[::1] parity_values,
+               const long long[::1] corner_above, int prime_count, long long all_values_mask):
+    """
+    Fill the cells order[start_depth:] of the flat grid in place; True if a
+    solution was found. The table arguments are 3_solve_grid._kernel_tables();
+    the search itself runs without the GIL.
+    """
+    cdef int solved
+    with nogil:
+        solved = solve_dfs(&grid[0], used_mask, start_depth, &order[0], order.shape[0], &is_prime[0],
+                           &neigh_ortho[0, 0], &neigh_diag[0, 0], neigh_ortho.shape[1], &ortho_forbid[0],
+                           &diag_forbid[0], &parity_values[0], &corner_above[0], prime_count, all_values_mask)
+    if solved < 0:
+        raise MemoryError("could not allocate the search buffer")
+    return solved == 1
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+NumPy cross-checks for finished grids, used by the solvers' --verify option.
+
+Every checker takes the flat row-major grid (any sequence of SIZE*SIZE ints)
+and tests the whole grid at once with array operations, independently of the
+bitset bookkeeping the solvers use to build it.
+"""
+
+from typing import Iterable, Sequence
+
+import numpy as np
+
+
+def _square(grid: Sequence[int]) -> np.ndarray:
+    """Reshape a flat grid into its SIZE x SIZE int64 array."""
+    values = np.asarray(grid, dtype=np.int64)
+    size = int(round(values.size ** 0.5))
+    if size * size != values.size:
+        raise ValueError(f"grid of {values.size} cells is not square")
+    return values.reshape(size, size)
+
+
+def verify_permutation(grid: Sequence[int]) -> bool:
+    """Every value 1..SIZE*SIZE is used exactly once."""
+    values = np.sort(np.asarray(grid, dtype=np.int64))
+    return bool((values == np.arange(1, values.size + 1)).all())
+
+
+def verify_c1(grid: Sequence[int]) -> bool:
+    """C1: no two orthogonally adjacent cells hold consecutive numbers."""
+    g = _square(grid)
+    return bool((np.abs(np.diff(g, axis=0)) != 1).all() and (np.abs(np.diff(g, axis=1)) != 1).all())
+
+
+def verify_c2(grid: Sequence[int]) -> bool:
+    """C2: no two diagonally adjacent cells differ by exactly 2."""
+    g = _square(grid)
+    down_right = np.abs(g[1:, 1:] - g[:-1, :-1])
+    down_left = np.abs(g[1:, :-1] - g[:-1, 1:])
+    return bool((down_right != 2).all() and (down_left != 2).all())
+
+
+def verify_c3(grid: Sequence[int], prime_idx: Iterable[int]) -> bool:
+    """C3: the values at the (flat) prime positions sum to an even number."""
+    values = np.asarray(grid, dtype=np.int64)
+    return int(values[list(prime_idx)].sum()) % 2 == 0
+
+
+def verify_c4(grid: Sequence[int], median: int) -> bool:
+    """C4: the median of the top row is exactly median."""
+    return bool(np.median(_square(grid)[0]) == median)
+
+
+def verify_c5(grid: Sequence[int], special_numbers: Iterable[int]) -> bool:
+    """C5: no row or column holds more than one of special_numbers."""
+    special = np.isin(_square(grid), list(special_numbers))
+    return bool((special.sum(axis=0) <= 1).all() and (special.sum(axis=1) <= 1).all())